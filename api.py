@@ -0,0 +1,381 @@
+# Read-only JSON API over the dashboard's worksheets for ERP and purchasing scripts.
+# Runs next to the Streamlit app and reuses its Sheets connection and aggregation code:
+#
+#     python api.py --host 127.0.0.1 --port 8502
+#
+# GET /api/version                  current data version
+# GET /api/usage?category=wood&...  material usage and as-of cost per material
+# GET /api/cost?...                 key metrics and total cost per category
+# GET /api/bom?pi=...               ORDER LIST x DATA BOM explosion with prices
+# GET /api/pi?pi=...&pi=...         per-PI bill of materials and cost across categories
+#
+# Filters repeat a parameter for several values: plan_date, month, delivery_month, trip, pi.
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from material_usage import (
+    CATEGORIES, category_columns, explode_bom, explode_material_usage, filter_orders, prepare_orders,
+    summarize_material_cost,
+)
+from pi_index import build_pi_index
+from price_history import PRICE_HISTORY_PATH, PRICE_HISTORY_WORKSHEET, price_as_of, record_price_snapshot
+
+FILTER_PARAMS = {
+    'plan_date': 'plan_dates',
+    'month': 'months',
+    'delivery_month': 'delivery_months',
+    'trip': 'trips',
+    'pi': 'pis',
+}
+
+
+logger = logging.getLogger(__name__)
+
+
+# Order-sheet columns the query filters compare against; query values are always text
+TEXT_FILTER_COLUMNS = ('PLAN DATE', 'TRIP', 'PI NUMBER')
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# The same Google Sheets connection the pages use (.streamlit/secrets.toml)
+def gsheets_connection():
+    import streamlit as st
+    from streamlit_gsheets import GSheetsConnection
+
+    return st.connection("gsheets", type=GSheetsConnection)
+
+
+# Drop empty rows and 'Unnamed' columns, as the pages do after each read
+def clean_worksheet(df):
+    df = df.dropna(how="all")
+    return df.loc[:, ~df.columns.astype(str).str.contains('^Unnamed')]
+
+
+# Sheet values as stripped text so query strings match numeric cells too. A numeric column with
+# blanks is read as float, so its whole numbers are written without the '.0' ('11', not '11.0').
+def text_column(values):
+    text = values.astype(str).str.strip()
+    if pd.api.types.is_float_dtype(values):
+        whole = values.notna() & (values % 1 == 0)
+        text[whole] = values[whole].astype('int64').astype(str)
+    return text.where(values.notna())
+
+
+def text_filter_columns(df):
+    return df.assign(**{column: text_column(df[column]) for column in TEXT_FILTER_COLUMNS if column in df.columns})
+
+
+# Worksheets loaded once and shared by every request until they are older than `ttl` seconds.
+# The data version is a hash of the worksheet contents and the price history they were costed with,
+# so ETags survive reloads that change nothing.
+# One request at a time reloads; the others keep getting the previous data meanwhile, and only
+# wait when nothing has been loaded yet.
+class DataStore:
+    def __init__(self, read_worksheet, ttl=300, price_history_path=PRICE_HISTORY_PATH, history_conn=None):
+        self.read_worksheet = read_worksheet
+        self.ttl = ttl
+        self.price_history_path = price_history_path
+        self.history_conn = history_conn
+        self.lock = threading.Lock()
+        self.loaded = threading.Condition(self.lock)
+        self.reloading = False
+        self.loaded_at = None
+        self.version = None
+        self.data = None
+
+    def snapshot(self):
+        with self.lock:
+            while self.reloading and self.data is None:
+                self.loaded.wait()
+            fresh = self.loaded_at is not None and time.monotonic() - self.loaded_at <= self.ttl
+            if fresh or self.reloading:
+                return self.version, self.data
+            self.reloading = True
+
+        try:
+            version, data = self.load()
+        except Exception:
+            with self.lock:
+                self.reloading = False
+                self.loaded.notify_all()
+                if self.data is None:
+                    raise
+                # Sheets outage: keep serving the last good data, the next request retries
+                logger.warning("Reloading worksheets failed, serving version %s", self.version, exc_info=True)
+                return self.version, self.data
+
+        with self.lock:
+            self.version, self.data = version, data
+            self.loaded_at = time.monotonic()
+            self.reloading = False
+            self.loaded.notify_all()
+            return version, data
+
+    def load(self):
+        worksheets = [config['worksheet'] for config in CATEGORIES.values()] + ['PRICE LIST', 'ORDER LIST', 'DATA BOM']
+        sheets = {worksheet: clean_worksheet(self.read_worksheet(worksheet)) for worksheet in worksheets}
+
+        # Costs also depend on the recorded price history (PRICE HISTORY worksheet, dates of undated rows)
+        price_history = record_price_snapshot(sheets['PRICE LIST'], path=self.price_history_path, conn=self.history_conn)
+        frames = dict(sheets, **{PRICE_HISTORY_WORKSHEET: price_history})
+
+        digest = hashlib.sha1()
+        for name, frame in frames.items():
+            digest.update(name.encode())
+            digest.update(pd.util.hash_pandas_object(frame.astype(str), index=False).to_numpy().tobytes())
+        version = digest.hexdigest()[:16]
+        if version == self.version:
+            return version, self.data  # unchanged worksheets and prices, nothing to rebuild
+
+        orders = {
+            category: text_filter_columns(prepare_orders(sheets[config['worksheet']]))
+            for category, config in CATEGORIES.items()
+        }
+        bom = price_as_of(explode_bom(sheets['ORDER LIST'], sheets['DATA BOM']), price_history)
+        data = {
+            'orders': orders,
+            'price_history': price_history,
+            'pi_index': build_pi_index(orders, price_history),
+            'bom': text_filter_columns(bom),
+        }
+        return version, data
+
+
+# Filter keyword arguments for filter_orders() from the query string
+def parse_filters(params):
+    unknown = set(params) - set(FILTER_PARAMS) - {'category'}
+    if unknown:
+        raise BadRequest(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+    return {
+        FILTER_PARAMS[name]: [value.strip() for value in values]
+        for name, values in params.items() if name in FILTER_PARAMS
+    }
+
+
+def parse_categories(params):
+    categories = params.get('category') or list(CATEGORIES)
+    unknown = [category for category in categories if category not in CATEGORIES]
+    if unknown:
+        raise BadRequest(f"unknown category: {', '.join(unknown)} (expected {', '.join(CATEGORIES)})")
+    return categories
+
+
+# Per-material usage and cost for one category, same numbers as the material pages
+def category_cost(data, category, filters):
+    filtered_df = filter_orders(data['orders'][category], **filters)
+    material_columns, value_columns = category_columns(filtered_df, category)
+    usage_df = explode_material_usage(filtered_df, material_columns, value_columns)
+    priced_usage_df = price_as_of(usage_df, data['price_history'])
+    summary = summarize_material_cost(priced_usage_df, 'MATERIAL')
+    summary = summary[summary['Total Usage'] > 0].sort_values(by='Total Price', ascending=False)
+    return filtered_df, summary
+
+
+def usage_payload(data, params):
+    filters = parse_filters(params)
+    return {
+        category: records(category_cost(data, category, filters)[1])
+        for category in parse_categories(params)
+    }
+
+
+def cost_payload(data, params):
+    filters = parse_filters(params)
+    payload = {}
+    for category in parse_categories(params):
+        filtered_df, summary = category_cost(data, category, filters)
+        payload[category] = {
+            'total_pi': int(len(filtered_df)),
+            'total_qty': float(pd.to_numeric(filtered_df['QTY'], errors='coerce').sum()),
+            'total_material': int(len(summary)),
+            'total_price': round(float(summary['Total Price'].sum()), 2),
+            'unpriced_material': int(summary['Unit Price'].isna().sum()),
+        }
+    payload['total_price'] = round(sum(totals['total_price'] for totals in payload.values()), 2)
+    return payload
+
+
+# Filters only the "ORDER BY ..." sheets carry; /api/bom resolves them to the PIs they select
+ORDER_ONLY_FILTERS = ('plan_dates', 'delivery_months', 'trips')
+
+
+# PIs on any category's order sheet that match the plan date / delivery month / trip filters
+def order_pis(data, filters):
+    return pd.concat([
+        filter_orders(orders, **filters)['PI NUMBER'] for orders in data['orders'].values()
+    ]).dropna().unique()
+
+
+def bom_payload(data, params):
+    if 'category' in params:
+        raise BadRequest("unknown parameter(s): category")
+    filters = parse_filters(params)
+
+    bom = data['bom']
+    order_filters = {name: filters[name] for name in ORDER_ONLY_FILTERS if name in filters}
+    if order_filters:
+        bom = bom[bom['PI NUMBER'].isin(order_pis(data, order_filters))]
+    if 'pis' in filters:
+        bom = bom[bom['PI NUMBER'].isin(filters['pis'])]
+    if 'months' in filters:
+        months = pd.to_datetime(bom['TIMESTAMP'], errors='coerce').dt.strftime('%b %Y')
+        bom = bom[months.isin(filters['months'])]
+
+    bom = bom.assign(**{'TOTAL PRICE': pd.to_numeric(bom['QTY'], errors='coerce')
+                        * pd.to_numeric(bom['USAGE'], errors='coerce') * bom['Unit Price']})
+    return records(bom)
+
+
+def pi_payload(data, params):
+    unknown = set(params) - {'pi'}
+    if unknown or not params.get('pi'):
+        raise BadRequest("expected one or more pi parameters")
+
+    pi_index = data['pi_index']
+    payload = {}
+    for pi in params['pi']:
+        bill = pi_index.bill_of_materials(pi)
+        total_price = bill['Total Price'].sum(min_count=1)
+        payload[pi] = {
+            'found': pi in pi_index,
+            'total_price': None if pd.isna(total_price) else round(float(total_price), 2),
+            'materials': records(bill),
+        }
+    return payload
+
+
+def records(df):
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+
+ENDPOINTS = {
+    '/api/usage': usage_payload,
+    '/api/cost': cost_payload,
+    '/api/bom': bom_payload,
+    '/api/pi': pi_payload,
+}
+
+
+# Rendered responses keyed on (data version, path, query); old versions age out of the LRU
+class ResponseCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self.lock:
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+# Request key and ETag for a query; parameter order does not matter
+def request_key(version, path, params):
+    query = tuple(sorted((name, tuple(sorted(values))) for name, values in params.items()))
+    key = (version, path, query)
+    etag = '"' + version + '-' + hashlib.sha1(repr(key[1:]).encode()).hexdigest()[:12] + '"'
+    return key, etag
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out in separate writes on kept-alive connections
+    store = None
+    cache = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+
+        try:
+            version, data = self.store.snapshot()
+        except Exception as exc:  # Sheets outage: report it instead of dropping the connection
+            return self.send_json(503, {'error': f"data unavailable: {exc}"})
+
+        if url.path == '/api/version':
+            return self.send_json(200, {'version': version})
+        if url.path not in ENDPOINTS:
+            return self.send_json(404, {'error': f"unknown endpoint {url.path}"})
+
+        key, etag = request_key(version, url.path, params)
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            return self.send_body(304, b'', etag)
+
+        body = self.cache.get(key)
+        if body is None:
+            try:
+                payload = ENDPOINTS[url.path](data, params)
+            except BadRequest as exc:
+                return self.send_json(400, {'error': str(exc)})
+            except Exception as exc:  # e.g. a renamed sheet column: answer in JSON instead of dropping the connection
+                logger.exception("Error serving %s", self.path)
+                return self.send_json(500, {'error': f"internal error: {exc!r}"})
+            body = json.dumps({'version': version, 'data': payload}).encode()
+            self.cache.put(key, body)
+        self.send_body(200, body, etag)
+
+    def send_json(self, status, payload):
+        self.send_body(status, json.dumps(payload).encode())
+
+    def send_body(self, status, body, etag=None):
+        self.send_response(status)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json')
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(store, host='127.0.0.1', port=8502, cache_entries=256, quiet=False):
+    handler = type('BoundApiHandler', (ApiHandler,), {'store': store, 'cache': ResponseCache(cache_entries)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON API for the BOM dashboard")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--ttl', type=int, default=300, help="seconds before worksheets are re-read")
+    parser.add_argument('--quiet', action='store_true', help="do not log each request")
+    args = parser.parse_args()
+
+    conn = gsheets_connection()
+    store = DataStore(lambda worksheet: conn.read(worksheet=worksheet, ttl=args.ttl), ttl=args.ttl, history_conn=conn)
+    server = make_server(store, args.host, args.port, quiet=args.quiet)
+    print(f"Serving BOM API on http://{args.host}:{server.server_address[1]}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Local load test for api.py against the synthetic workbook: requests per second and latency.
+# Run from the repository root: python benchmarks/bench_api.py [clients] [seconds]
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import DataStore, make_server  # noqa: E402
+from fake_sheets import FakeSheetsConnection  # noqa: E402
+
+# A planner-like mix of queries; a few distinct filters repeated many times
+QUERIES = [
+    '/api/cost',
+    '/api/usage?category=wood',
+    '/api/usage?category=fabric&month=Jan+2024',
+    '/api/cost?trip=TRIP+1&trip=TRIP+2',
+    '/api/usage?category=sponge&plan_date=PLAN+03',
+    '/api/bom?pi=PI000042',
+    '/api/pi?pi=PI000042&pi=PI000077',
+    '/api/cost?month=Mar+2024&category=other',
+]
+
+
+def client(port, deadline, revalidate, latencies, statuses):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    etags = {}
+    i = 0
+    while time.perf_counter() < deadline:
+        path = QUERIES[i % len(QUERIES)]
+        i += 1
+        headers = {'If-None-Match': etags[path]} if revalidate and path in etags else {}
+        start = time.perf_counter()
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status)
+        if response.getheader('ETag'):
+            etags[path] = response.getheader('ETag')
+    conn.close()
+
+
+def run(port, clients, seconds, revalidate):
+    latencies, statuses = [], []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=client, args=(port, deadline, revalidate, latencies, statuses))
+        for _ in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies = np.array(latencies) * 1000
+    label = 'ETag revalidation' if revalidate else 'full responses'
+    print(f"{label:18}: {len(latencies) / seconds:8.0f} req/s  "
+          f"p50 {np.percentile(latencies, 50):6.2f} ms  p95 {np.percentile(latencies, 95):6.2f} ms  "
+          f"200={statuses.count(200)} 304={statuses.count(304)}")
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    sheets = FakeSheetsConnection()
+    history_path = os.path.join(tempfile.mkdtemp(), 'price_history.csv')
+    store = DataStore(lambda worksheet: sheets.read(worksheet=worksheet), price_history_path=history_path)
+    server = make_server(store, port=0, quiet=True)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Cold requests compute the aggregates; everything after is served from the response cache
+    start = time.perf_counter()
+    store.snapshot()
+    print(f"initial load      : {(time.perf_counter() - start) * 1000:8.1f} ms ({sheets.reads} worksheet reads)")
+    for path in QUERIES:
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        start = time.perf_counter()
+        conn.request('GET', path)
+        status = conn.getresponse()
+        status.read()
+        print(f"cold {path:45}: {(time.perf_counter() - start) * 1000:8.1f} ms  ({status.status})")
+        conn.close()
+
+    run(port, clients, seconds, revalidate=False)
+    run(port, clients, seconds, revalidate=True)
+    print(f"worksheet reads during the test: {sheets.reads}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Time building the price-list n-gram index and reconciling unmatched materials against it.
+# Run from the repository root: python benchmarks/bench_material_match.py [descriptions] [materials]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from material_match import NgramIndex, reconcile_materials  # noqa: E402
+
+WORDS = np.array([
+    'PLYWOOD', 'MDF', 'PINE', 'OAK', 'RUBBERWOOD', 'FOAM', 'SPONGE', 'FABRIC', 'VELVET', 'LINEN',
+    'SCREW', 'BOLT', 'GLUE', 'DENSITY', 'GREY', 'BLACK', 'BROWN', 'BEIGE', 'LEG', 'ARM',
+])
+
+
+def make_data(descriptions, materials, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [
+        ' '.join(rng.choice(WORDS, 3)) + f' {rng.integers(1, 200)}MM {i % 500}'
+        for i in range(descriptions)
+    ]
+    # Unmatched materials are near-misses of real descriptions (spacing and spelling drift)
+    picks = rng.integers(0, descriptions, materials)
+    misspelt = [names[i].replace('MM', ' MM').replace('O', '0', 1) for i in picks]
+    return names, pd.DataFrame({'SOURCE': 'ORDER BY WOOD', 'MATERIAL': misspelt, 'OCCURRENCES': 1})
+
+
+def main():
+    descriptions = int(sys.argv[1]) if len(sys.argv) > 1 else 30_000
+    materials = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    names, unmatched = make_data(descriptions, materials)
+
+    start = time.perf_counter()
+    index = NgramIndex(names)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = reconcile_materials(unmatched, index)
+    reconcile = time.perf_counter() - start
+
+    print(f"descriptions={len(index)} materials={len(result)}")
+    print(f"index build : {build * 1000:8.1f} ms")
+    print(f"reconcile   : {reconcile * 1000:8.1f} ms  ({reconcile / max(len(result), 1) * 1000:.2f} ms/material)")
+
+
+if __name__ == "__main__":
+    main()
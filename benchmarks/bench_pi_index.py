@@ -0,0 +1,57 @@
+# Compare a PI drill-down through the PI index with rerunning the page pipeline filtered to that PI.
+# Run from the repository root: python benchmarks/bench_pi_index.py [orders]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_sheets import make_workbook  # noqa: E402
+from material_usage import (  # noqa: E402
+    CATEGORIES, category_columns, explode_material_usage, filter_orders, prepare_orders, summarize_material_cost,
+)
+from pi_index import build_pi_index  # noqa: E402
+from price_history import price_as_of, record_price_snapshot  # noqa: E402
+
+
+def pipeline_cost(orders, price_history, pi):
+    total = 0.0
+    for category, df in orders.items():
+        filtered_df = filter_orders(df, pis=[pi])
+        material_columns, value_columns = category_columns(filtered_df, category)
+        usage_df = price_as_of(explode_material_usage(filtered_df, material_columns, value_columns), price_history)
+        total += summarize_material_cost(usage_df, 'MATERIAL')['Total Price'].sum()
+    return total
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    workbook = make_workbook(orders=rows)
+    orders = {category: prepare_orders(workbook[config['worksheet']]) for category, config in CATEGORIES.items()}
+    price_history = record_price_snapshot(
+        workbook['PRICE LIST'], path=os.path.join(tempfile.mkdtemp(), 'price_history.csv')
+    )
+
+    start = time.perf_counter()
+    index = build_pi_index(orders, price_history)
+    build = time.perf_counter() - start
+
+    pis = index.pis[:: max(len(index) // 20, 1)][:20]
+    start = time.perf_counter()
+    indexed = [index.bill_of_materials(pi)['Total Price'].sum() for pi in pis]
+    drill = (time.perf_counter() - start) / len(pis)
+
+    start = time.perf_counter()
+    rerun = [pipeline_cost(orders, price_history, pi) for pi in pis]
+    pipeline = (time.perf_counter() - start) / len(pis)
+
+    mismatches = sum(abs(a - b) > 1e-6 * max(abs(b), 1) for a, b in zip(indexed, rerun))
+    print(f"orders={rows} pis={len(index)} usage_rows={len(index.usage)}")
+    print(f"index build   : {build * 1000:8.1f} ms (once per refresh)")
+    print(f"PI drill-down : {drill * 1000:8.2f} ms per PI")
+    print(f"page pipeline : {pipeline * 1000:8.2f} ms per PI ({pipeline / drill:.0f}x slower, {mismatches} mismatches)")
+
+
+if __name__ == "__main__":
+    main()
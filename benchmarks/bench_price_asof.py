@@ -0,0 +1,62 @@
+# Compare the as-of price join against the old flat merge on synthetic exploded usage.
+# Run from the repository root: python benchmarks/bench_price_asof.py [rows]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from price_history import price_as_of  # noqa: E402
+
+
+def make_data(rows, materials=5000, versions=4, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"MATERIAL {i:05d}" for i in range(materials)], dtype=object)
+
+    usage = pd.DataFrame({
+        'TIMESTAMP': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, rows), unit='D'),
+        'PI NUMBER': rng.integers(0, rows // 20 + 1, rows).astype(str),
+        'MATERIAL': names[rng.integers(0, materials, rows)],
+        'USAGE': rng.random(rows) * 10,
+    })
+
+    history = pd.DataFrame({
+        'Description': np.repeat(names, versions),
+        'Unit Price': rng.random(materials * versions) * 100,
+        'EFFECTIVE DATE': pd.Timestamp('2023-01-01')
+            + pd.to_timedelta(np.tile(np.arange(versions) * (730 // versions), materials), unit='D'),
+    })
+    return usage, history
+
+
+def flat_merge(usage, history):
+    latest = history.sort_values('EFFECTIVE DATE').drop_duplicates('Description', keep='last')
+    return pd.merge(usage, latest[['Description', 'Unit Price']], left_on='MATERIAL', right_on='Description', how='left')
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    usage, history = make_data(rows)
+
+    flat = best_of(lambda: flat_merge(usage, history))
+    asof = best_of(lambda: price_as_of(usage, history))
+
+    print(f"rows={rows} price_versions={len(history)}")
+    print(f"flat merge : {flat * 1000:8.1f} ms")
+    print(f"as-of join : {asof * 1000:8.1f} ms  ({asof / flat:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Synthetic stand-in for the dashboard's Google Sheet, shaped like the real worksheets.
+# Used by the benchmarks so they run without Sheets credentials or network access.
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from gspread.exceptions import WorksheetNotFound
+
+# Category value-column prefix -> material column prefix, as on the "ORDER BY ..." sheets
+ORDER_SHEETS = {
+    'ORDER BY WOOD': ('WOOD', 'MATERIAL WOOD'),
+    'ORDER BY SPONGE': ('SPONGE', 'MATERIAL SPONGE'),
+    'ORDER BY FABRIC': ('FABRIC', 'MATERIAL FABRIC'),
+    'ORDER BY OTHER MATERIAL': ('O.M', 'OTHER MATERIAL'),
+}
+
+
+def make_workbook(orders=5_000, slots=4, materials_per_category=400, models=300, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2023-01-01')
+
+    timestamps = start + pd.to_timedelta(rng.integers(0, 730, orders), unit='D')
+    pis = np.array([f"PI{i:06d}" for i in rng.integers(0, max(orders // 3, 1), orders)], dtype=object)
+    base = {
+        'TIMESTAMP': timestamps.strftime('%Y-%m-%d %H:%M:%S'),
+        'DELIVERY PLAN DATE': (timestamps + pd.to_timedelta(rng.integers(14, 90, orders), unit='D')).strftime('%Y-%m-%d'),
+        'PLAN DATE': np.array([f"PLAN {i:02d}" for i in rng.integers(1, 25, orders)], dtype=object),
+        'TRIP': np.array([f"TRIP {i}" for i in rng.integers(1, 9, orders)], dtype=object),
+        'PI NUMBER': pis,
+        'QTY': rng.integers(1, 20, orders),
+    }
+
+    workbook = {}
+    names = {}
+    for worksheet, (value_prefix, material_prefix) in ORDER_SHEETS.items():
+        names[value_prefix] = np.array(
+            [f"{value_prefix.rstrip('.')} MATERIAL {i:04d}" for i in range(materials_per_category)], dtype=object
+        )
+        sheet = dict(base)
+        for slot in range(1, slots + 1):
+            picks = names[value_prefix][rng.integers(0, materials_per_category, orders)]
+            picks[rng.random(orders) < 0.3] = None
+            sheet[f'{material_prefix} {slot}'] = picks
+            sheet[f'{value_prefix} {slot}'] = np.round(rng.random(orders) * 5, 2)
+        workbook[worksheet] = pd.DataFrame(sheet)
+
+    # Each model's bill of materials, one material slot per category
+    model_names = np.array([f"MODEL {i:04d}" for i in range(models)], dtype=object)
+    data_bom = {'CONFIRM MODEL NAME': model_names}
+    for value_prefix, material_prefix in ORDER_SHEETS.values():
+        data_bom[f'{material_prefix} 1'] = names[value_prefix][rng.integers(0, materials_per_category, models)]
+        data_bom[f'{value_prefix} 1'] = np.round(rng.random(models) * 5, 2)
+    workbook['DATA BOM'] = pd.DataFrame(data_bom)
+
+    workbook['ORDER LIST'] = pd.DataFrame({
+        'TIMESTAMP': base['TIMESTAMP'],
+        'PI NUMBER': pis,
+        'ORDER': np.array([f"SO{i:06d}" for i in range(orders)], dtype=object),
+        'TYPE': rng.choice(np.array(['LOCAL', 'EXPORT'], dtype=object), orders),
+        'MODEL': model_names[rng.integers(0, models, orders)],
+        'QTY': base['QTY'],
+    })
+
+    # Two price versions per material so the as-of join has history to pick from
+    descriptions = np.concatenate(list(names.values()))
+    workbook['PRICE LIST'] = pd.DataFrame({
+        'Description': np.concatenate([descriptions, descriptions]),
+        'Unit Price': np.round(rng.random(len(descriptions) * 2) * 100, 2),
+        'UOM Count': 1,
+        'Stock Control': 'YES',
+        'Is Active': 'YES',
+        'Order Price': 0.0,
+        'Update': np.repeat(['2023-01-01', '2024-01-01'], len(descriptions)),
+    })
+    return workbook
+
+
+# Drop-in for the GSheetsConnection's read(): serves the synthetic workbook after a fixed delay.
+# Like the real connection, a read with a ttl is served from cache until it is ttl seconds old.
+class FakeSheetsConnection:
+    def __init__(self, workbook=None, latency=0.0):
+        self.workbook = workbook if workbook is not None else make_workbook()
+        self.latency = latency
+        self.reads = 0
+        self.cached = {}
+        self.lock = threading.Lock()
+
+    def read(self, worksheet=None, ttl=None, **kwargs):
+        if worksheet not in self.workbook:
+            raise WorksheetNotFound(worksheet)
+        now = time.monotonic()
+        with self.lock:
+            cached = self.cached.get(worksheet)
+        if ttl and cached is not None and now - cached < ttl:
+            return self.workbook[worksheet].copy()
+
+        with self.lock:
+            self.reads += 1
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.cached[worksheet] = time.monotonic()
+        return self.workbook[worksheet].copy()
+
+    def update(self, worksheet=None, data=None, **kwargs):
+        if worksheet not in self.workbook:
+            raise WorksheetNotFound(worksheet)
+        return self.create(worksheet=worksheet, data=data)
+
+    def create(self, worksheet=None, data=None, **kwargs):
+        with self.lock:
+            self.workbook[worksheet] = data.copy()
+            self.cached.pop(worksheet, None)
+        return data
@@ -0,0 +1,256 @@
+# Concurrent-session load test for the dashboard pages.
+# Each simulated planner cycles through every page headlessly with Streamlit's AppTest, changing a
+# sidebar filter before every rerun, against a fake Sheets connection with injected read latency.
+# Every session count runs the same page mix, so levels are comparable; reports rerun latency,
+# throughput, CPU and memory for each session count, then latency per page.
+#
+# Run from the repository root:
+#     python benchmarks/load_test.py --sessions 1 2 4 8 --reruns 16 --latency 0.2
+#
+# AppTest swaps process-wide runtime state on every run, so each session runs in its own worker
+# process, pinned to --cpus cores (1 by default) to approximate a single instance. Unlike one
+# Streamlit server, the workers do not share st.cache_data / st.cache_resource or the Sheets
+# connection's cache: each rebuilds its own indexes and reads the worksheets itself.
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_PAGES = [
+    'WOOD_MATERIAL.py',
+    'pages/2_SPONGE MATERIAL.py',
+    'pages/3_FABRIC MATERIAL.py',
+    'pages/4_OTHER MATERIAL.py',
+    'pages/5_PRICE LIST.py',
+    'pages/6_DATA SALES CO & BOM.py',
+    'pages/7_UNMATCHED MATERIAL.py',
+    'pages/8_PI DRILL DOWN.py',
+]
+
+
+# Resident memory of this process in bytes (peak RSS where /proc is unavailable)
+def rss_bytes():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# Change one sidebar filter the way a planner would: pick a few values, go back to the
+# page's default selection, or switch a radio option
+def change_filter(app, rng, defaults):
+    widgets = list(app.multiselect) + list(app.radio)
+    if not widgets:
+        return 'rerun'
+
+    widget = rng.choice(widgets)
+    if widget in app.radio:
+        widget.set_value(rng.choice(widget.options))
+    elif widget.label in defaults and rng.random() < 0.3:
+        widget.set_value(defaults[widget.label])
+    elif widget.options:
+        widget.set_value(rng.sample(list(widget.options), rng.randint(1, min(3, len(widget.options)))))
+    return widget.label
+
+
+def failed_session(offset, error):
+    return {'session': offset, 'pages': [], 'latencies': [], 'errors': [f"session {offset}: {error}"],
+            'cpu': 0.0, 'rss': 0, 'reads': 0}
+
+
+def run_session(offset, options, seed, barrier, results):
+    try:
+        results.put(drive_session(offset, options, seed, barrier))
+    except Exception as exc:  # report the failure instead of leaving the parent waiting
+        barrier.abort()
+        results.put(failed_session(offset, repr(exc)))
+
+
+# One planner moving through every page in turn, starting at page `offset` so concurrent
+# sessions are spread over the pages rather than all hitting the same one at once
+def drive_session(offset, options, seed, barrier):
+    if options.cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, range(options.cpus))
+
+    os.environ['PRICE_HISTORY_PATH'] = os.path.join(tempfile.mkdtemp(), 'price_history.csv')
+    sys.path[:0] = [ROOT, BENCHMARKS]
+
+    import streamlit as st
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    from fake_sheets import FakeSheetsConnection, make_workbook
+
+    set_log_level('error')
+    sheets = FakeSheetsConnection(make_workbook(orders=options.orders), latency=options.latency)
+    st.connection = lambda *args, **kwargs: sheets
+
+    apps, defaults = {}, {}
+    for page in options.pages:
+        app = AppTest.from_file(os.path.join(ROOT, page), default_timeout=options.timeout)
+        app.secrets['users'] = {'loadtest@example.com': 'loadtest'}
+        app.session_state['logged_in'] = True
+        app.session_state['show_success'] = False
+
+        # Warm-up load outside the measurement: imports and first reads, as on a server already running
+        app.run()
+        apps[page] = app
+        defaults[page] = {widget.label: list(widget.value) for widget in app.multiselect}
+    sheets.reads = 0
+    barrier.wait(timeout=options.timeout)
+
+    rng = random.Random(seed)
+    pages, latencies, errors = [], [], []
+    started, cpu_started = time.time(), time.process_time()
+    for rerun in range(options.reruns):
+        page = options.pages[(offset + rerun) % len(options.pages)]
+        app = apps[page]
+        action = change_filter(app, rng, defaults[page])
+        start = time.perf_counter()
+        try:
+            app.run()
+            if app.exception:
+                errors.append(f"{page} after {action}: {app.exception[0].message}")
+        except Exception as exc:  # a timed-out or crashed rerun still counts against the session
+            errors.append(f"{page} after {action}: {exc!r}")
+        latencies.append(time.perf_counter() - start)
+        pages.append(page)
+        if options.think:
+            time.sleep(options.think)
+
+    return {
+        'session': offset,
+        'pages': pages,
+        'latencies': latencies,
+        'errors': errors,
+        'started': started,
+        'finished': time.time(),
+        'cpu': time.process_time() - cpu_started,
+        'rss': rss_bytes(),
+        'reads': sheets.reads,
+    }
+
+
+def run_level(sessions, options):
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(sessions)
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=run_session,
+            args=(i, options, options.seed + i, barrier, results),
+        )
+        for i in range(sessions)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # Collect one report per session. A worker killed before it could report (OOM, a crash in a
+    # native extension) counts as a failed session, and the barrier is released for the others.
+    reports = {}
+    while len(reports) < sessions:
+        try:
+            report = results.get(timeout=1)
+            reports.setdefault(report['session'], report)
+        except queue.Empty:
+            for i, worker in enumerate(workers):
+                if i not in reports and worker.exitcode is not None:
+                    barrier.abort()
+                    reports[i] = failed_session(i, f"worker exited with code {worker.exitcode} without reporting")
+    for worker in workers:
+        worker.join()
+    reports = list(reports.values())
+
+    errors = [error for report in reports for error in report['errors']]
+    reports = [report for report in reports if report['latencies']]
+    if not reports:
+        raise SystemExit(f"no session completed: {errors[0]}")
+
+    pages = np.concatenate([report['pages'] for report in reports])
+    latencies = np.concatenate([report['latencies'] for report in reports]) * 1000
+    wall = max(report['finished'] for report in reports) - min(report['started'] for report in reports)
+    cpu = sum(report['cpu'] for report in reports)
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'errors': len(errors),
+        'p50': np.percentile(latencies, 50),
+        'p95': np.percentile(latencies, 95),
+        'max': latencies.max(),
+        'throughput': len(latencies) / wall,
+        'cpu_per_rerun': cpu / len(latencies) * 1000,
+        'cpu_util': cpu / wall * 100,
+        'rss': np.mean([report['rss'] for report in reports]) / 2 ** 20,
+        'reads': np.mean([report['reads'] for report in reports]),
+        'per_page': {page: latencies[pages == page] for page in np.unique(pages)},
+        'first_error': errors[0] if errors else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the dashboard pages")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8], help="session counts to test")
+    parser.add_argument('--reruns', type=int, default=16, help="filter changes (reruns) per session, spread over the pages")
+    parser.add_argument('--latency', type=float, default=0.2, help="seconds added to every worksheet read")
+    parser.add_argument('--orders', type=int, default=5_000, help="rows per synthetic order sheet")
+    parser.add_argument('--pages', nargs='+', default=DEFAULT_PAGES, help="pages to drive, relative to the repo root")
+    parser.add_argument('--think', type=float, default=0.0, help="seconds a planner waits between reruns")
+    parser.add_argument('--cpus', type=int, default=1, help="pin all sessions to this many cores, 0 for all (Linux)")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds before a rerun is abandoned")
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args()
+
+    # Whole cycles through the pages, so every session, and so every session count, runs the same mix
+    options.reruns = -(-options.reruns // len(options.pages)) * len(options.pages)
+
+    print(f"pages={len(options.pages)} reruns/session={options.reruns} read latency={options.latency}s "
+          f"orders={options.orders} cpus={options.cpus or os.cpu_count()}")
+    print("note: each session is a separate process; st.cache_data, st.cache_resource and the Sheets "
+          "connection cache are not shared, so indexes are rebuilt and worksheets read once per session")
+    print(f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+          f"{'reruns/s':>8} {'CPU ms/rerun':>12} {'CPU %':>6} {'RSS MB/session':>14} {'reads/session':>13}")
+
+    failures, levels = [], []
+    for sessions in options.sessions:
+        level = run_level(sessions, options)
+        levels.append(level)
+        print(f"{level['sessions']:>8} {level['reruns']:>7} {level['errors']:>6} {level['p50']:>8.0f} "
+              f"{level['p95']:>8.0f} {level['max']:>8.0f} {level['throughput']:>8.2f} "
+              f"{level['cpu_per_rerun']:>12.0f} {level['cpu_util']:>6.0f} {level['rss']:>14.0f} "
+              f"{level['reads']:>13.1f}")
+        if level['first_error']:
+            failures.append(level['first_error'])
+
+    # Latency per page at each session count: p50 / p95 in ms
+    print()
+    print(f"{'page':32} " + " ".join(f"{str(level['sessions']) + ' sessions':>15}" for level in levels))
+    for page in options.pages:
+        cells = []
+        for level in levels:
+            latencies = level['per_page'].get(page)
+            cells.append(f"{np.percentile(latencies, 50):>7.0f}/{np.percentile(latencies, 95):<7.0f}"
+                         if latencies is not None and len(latencies) else f"{'-':>15}")
+        print(f"{os.path.basename(page):32} " + " ".join(cells))
+
+    for failure in failures:
+        print(f"error: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
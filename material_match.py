@@ -0,0 +1,110 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from price_history import normalize_description
+
+
+# Character n-grams of a normalized description, padded so short names still match
+def description_ngrams(text, n=3):
+    padded = f"  {' '.join(str(text).split())}  "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+# Prebuilt n-gram index over price-list descriptions.
+# A lookup only visits the postings of the query's own n-grams, so matching m materials
+# never compares every material with every description.
+class NgramIndex:
+    def __init__(self, descriptions, n=3, max_postings=200):
+        self.n = n
+        self.descriptions = pd.Series(descriptions, dtype='string').dropna()
+        self.descriptions = normalize_description(self.descriptions).drop_duplicates().reset_index(drop=True)
+
+        postings = defaultdict(list)
+        self.grams = []
+        for doc_id, description in enumerate(self.descriptions):
+            grams = frozenset(description_ngrams(description, n))
+            self.grams.append(grams)
+            for gram in grams:
+                postings[gram].append(doc_id)
+
+        self.postings = {gram: np.asarray(ids, dtype=np.int64) for gram, ids in postings.items()}
+        self.names = self.descriptions.tolist()
+        self.known = set(self.names)
+
+        # n-grams shared by a large share of the list (e.g. " MM") say little about a match;
+        # they are skipped when gathering candidates but still count in the final score
+        self.max_postings = max(max_postings, int(len(self.descriptions) * 0.02))
+
+    def __len__(self):
+        return len(self.descriptions)
+
+    def __contains__(self, description):
+        return description in self.known
+
+    # Closest descriptions for one material, scored by Dice similarity of their n-gram sets
+    def suggest(self, material, limit=3, min_score=0.3, candidates=50):
+        grams = description_ngrams(material, self.n)
+        hits = sorted((self.postings[gram] for gram in grams if gram in self.postings), key=len)
+        if not hits:
+            return []
+
+        # Count shared rare n-grams to shortlist candidates, falling back to the rarest few
+        rare = [ids for ids in hits if len(ids) <= self.max_postings] or hits[:3]
+        doc_ids, overlap = np.unique(np.concatenate(rare), return_counts=True)
+        if len(doc_ids) > candidates:
+            doc_ids = doc_ids[np.argpartition(-overlap, candidates)[:candidates]]
+
+        scored = []
+        for doc_id in doc_ids:
+            doc_grams = self.grams[doc_id]
+            score = 2 * len(grams & doc_grams) / (len(grams) + len(doc_grams))
+            if score >= min_score:
+                scored.append((round(score, 3), self.names[doc_id]))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(description, score) for score, description in scored[:limit]]
+
+
+# Distinct normalized materials from the given columns, with how often each appears
+def collect_materials(df, material_columns, source):
+    values = normalize_description(pd.Series(df[material_columns].values.ravel()))
+    counts = values.dropna().loc[lambda s: s != ''].value_counts()
+    return pd.DataFrame({'SOURCE': source, 'MATERIAL': counts.index.astype(str), 'OCCURRENCES': counts.to_numpy()})
+
+
+# Price-list descriptions whose 'Unit Price' is blank or not a number
+def unpriced_descriptions(df_price_list):
+    prices = pd.to_numeric(df_price_list['Unit Price'], errors='coerce')
+    return set(normalize_description(df_price_list.loc[prices.isna(), 'Description']).dropna())
+
+
+# Materials that price_as_of() cannot price, each with its closest priced descriptions.
+# `index` is built over the priced history descriptions; STATUS tells a material listed on the
+# price list without a usable price apart from one the price list does not have at all.
+def reconcile_materials(materials, index, limit=3, min_score=0.3, missing_price=()):
+    unmatched = materials[~materials['MATERIAL'].isin(index.known)]
+    unmatched = unmatched.groupby('MATERIAL', sort=False).agg(
+        SOURCES=('SOURCE', lambda s: ', '.join(sorted(set(s)))),
+        OCCURRENCES=('OCCURRENCES', 'sum'),
+    ).reset_index()
+    unmatched.insert(1, 'STATUS', np.where(
+        unmatched['MATERIAL'].isin(set(missing_price)), 'PRICE MISSING', 'NOT ON PRICE LIST'
+    ))
+
+    rows = []
+    for material in unmatched['MATERIAL']:
+        suggestions = index.suggest(material, limit=limit, min_score=min_score)
+        row = {'MATERIAL': material}
+        for rank in range(limit):
+            description, score = suggestions[rank] if rank < len(suggestions) else (None, None)
+            row[f'SUGGESTION {rank + 1}'] = description
+            row[f'SCORE {rank + 1}'] = score
+        rows.append(row)
+
+    suggestions = pd.DataFrame(rows, columns=['MATERIAL'] + [
+        f'{label} {rank + 1}' for rank in range(limit) for label in ('SUGGESTION', 'SCORE')
+    ])
+    result = unmatched.merge(suggestions, on='MATERIAL', how='left')
+    return result.sort_values('OCCURRENCES', ascending=False, ignore_index=True)
@@ -0,0 +1,125 @@
+import pandas as pd
+
+from price_history import normalize_description
+
+
+# Reshape an "ORDER BY ..." sheet into one row per (order row, material slot).
+# Each MATERIAL column is paired with its value column in sheet order; USAGE is value x QTY.
+def explode_material_usage(df, material_columns, value_columns, id_columns=('TIMESTAMP', 'PI NUMBER')):
+    id_columns = [col for col in id_columns if col in df.columns]
+    qty = pd.to_numeric(df['QTY'], errors='coerce')
+
+    frames = []
+    for material_col, value_col in zip(material_columns, value_columns):
+        part = df[id_columns].copy()
+        part['MATERIAL'] = normalize_description(df[material_col])
+        part['USAGE'] = pd.to_numeric(df[value_col], errors='coerce') * qty
+        frames.append(part)
+
+    if not frames:
+        return pd.DataFrame(columns=id_columns + ['MATERIAL', 'USAGE'])
+
+    exploded = pd.concat(frames, ignore_index=True)
+    return exploded.dropna(subset=['MATERIAL', 'USAGE'])
+
+
+# Sum usage and as-of cost per material, keeping the page's material column name.
+# 'Unit Price' is the usage-weighted price actually paid across the selected orders.
+def summarize_material_cost(priced_usage, material_label):
+    priced_usage = priced_usage.assign(**{'Total Price': priced_usage['USAGE'] * priced_usage['Unit Price']})
+    grouped = priced_usage.groupby('MATERIAL', sort=False)
+    summary = pd.DataFrame({
+        'Total Usage': grouped['USAGE'].sum(),
+        'Total Price': grouped['Total Price'].sum(min_count=1),
+    }).reset_index()
+    summary['Unit Price'] = summary['Total Price'] / summary['Total Usage']
+    summary = summary.rename(columns={'MATERIAL': material_label})
+    return summary[[material_label, 'Total Usage', 'Unit Price', 'Total Price']]
+
+
+# Order sheets per material category: worksheet, material/value column prefixes and the page's label
+CATEGORIES = {
+    'wood': {'worksheet': 'ORDER BY WOOD', 'material': 'MATERIAL WOOD', 'value': 'WOOD', 'label': 'Wood Material'},
+    'sponge': {'worksheet': 'ORDER BY SPONGE', 'material': 'MATERIAL SPONGE', 'value': 'SPONGE', 'label': 'Sponge Material'},
+    'fabric': {'worksheet': 'ORDER BY FABRIC', 'material': 'MATERIAL FABRIC', 'value': 'FABRIC', 'label': 'Fabric Material'},
+    'other': {'worksheet': 'ORDER BY OTHER MATERIAL', 'material': 'OTHER MATERIAL', 'value': 'O.M', 'label': 'Other Material'},
+}
+
+
+# Paired MATERIAL / value columns of an order sheet for one category
+def category_columns(df, category):
+    config = CATEGORIES[category]
+    material_columns = [col for col in df.columns if config['material'] in col]
+    value_columns = [col for col in df.columns if col.startswith(config['value'])]
+    return material_columns, value_columns
+
+
+# Clean an "ORDER BY ..." sheet and add the month columns the filters work on
+def prepare_orders(df):
+    df = df.dropna(how="all").copy()
+    df['TIMESTAMP'] = pd.to_datetime(df['TIMESTAMP'], errors='coerce')
+    df['DELIVERY PLAN DATE'] = pd.to_datetime(df['DELIVERY PLAN DATE'], errors='coerce')
+    df['month_year'] = df['TIMESTAMP'].dt.strftime('%b %Y')
+    df['delivery_month_year'] = df['DELIVERY PLAN DATE'].dt.strftime('%b %Y')
+    return df
+
+
+# Apply the sidebar filters. A filter left as None behaves like the page default of
+# "everything selected", which still leaves out rows with no value for that field.
+def filter_orders(df, plan_dates=None, months=None, delivery_months=None, trips=None, pis=None):
+    def selected(column, values):
+        return df[column].notna() if values is None else df[column].isin(values)
+
+    return df[
+        selected('month_year', months) &
+        selected('delivery_month_year', delivery_months) &
+        selected('PI NUMBER', pis) &
+        selected('TRIP', trips) &
+        (df['PLAN DATE'].isin(plan_dates) if plan_dates else True)
+    ]
+
+
+# Exploded usage of every category's order sheet in one frame, tagged with its CATEGORY
+def explode_orders(orders):
+    frames = []
+    for category, df in orders.items():
+        material_columns, value_columns = category_columns(df, category)
+        usage_df = explode_material_usage(df, material_columns, value_columns)
+        usage_df['CATEGORY'] = category
+        frames.append(usage_df)
+    return pd.concat(frames, ignore_index=True)
+
+
+# Join "ORDER LIST" with "DATA BOM" and melt it into one row per (PI NUMBER, MATERIAL)
+def explode_bom(df_order_list, df_data_bom):
+    # Merge "ORDER LIST" with "DATA BOM" on the 'MODEL' and 'CONFIRM MODEL NAME' columns
+    merge_data = pd.merge(df_order_list, df_data_bom, left_on='MODEL', right_on='CONFIRM MODEL NAME', how='left')
+
+    # Filter columns that contain raw materials and corresponding values
+    raw_materials = [col for col in merge_data.columns if 'MATERIAL' in col]
+    raw_materials_value_columns = [col for col in merge_data.columns if col.startswith(('WOOD', 'FABRIC', 'SPONGE', 'O.M'))]
+
+    # Melt the data to reshape it, extracting the raw materials and usage data
+    materials = merge_data.melt(
+        id_vars=['TIMESTAMP', 'PI NUMBER', 'ORDER', 'TYPE', 'MODEL', 'QTY'],
+        value_vars=raw_materials,
+        var_name='Material Column',
+        value_name='MATERIAL'
+    )
+
+    usage = merge_data.melt(
+        id_vars=['PI NUMBER'],
+        value_vars=raw_materials_value_columns,
+        var_name='Usage Column',
+        value_name='USAGE'
+    )
+
+    # Concatenate materials and usage data
+    materials_usage = pd.concat(
+        [materials[['TIMESTAMP', 'PI NUMBER', 'ORDER', 'TYPE', 'MODEL', 'QTY', 'MATERIAL']], usage['USAGE']],
+        axis=1
+    )
+
+    # Drop rows with missing materials and remove duplicate records for each PI NUMBER and MATERIAL
+    materials_usage = materials_usage.dropna(subset=['MATERIAL'])
+    return materials_usage.drop_duplicates(subset=['PI NUMBER', 'MATERIAL'])
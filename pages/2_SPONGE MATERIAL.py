@@ -4,6 +4,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import time
 
+from material_usage import explode_material_usage, filter_orders, prepare_orders, summarize_material_cost
+from price_history import cached_price_history, price_as_of
+
 def main():
     if not st.session_state.get("logged_in", False):
         st.error("Please log in from the WOOD MATERIAL page.")
@@ -17,26 +20,17 @@ def main():
 
     conn = st.connection("gsheets", type=GSheetsConnection)
     df = conn.read(worksheet="ORDER BY SPONGE", ttl=5)
-    df = df.dropna(how="all")
+    df = prepare_orders(df)
 
     df_price_list = conn.read(worksheet="PRICE LIST", ttl=5)
     df_price_list= df_price_list.dropna(how="all")
 
     # st.dataframe(df)
 
-    # Convert date column to datetime
-    date_column = 'TIMESTAMP'
-    df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
-
-    delivery_date_column = 'DELIVERY PLAN DATE'
-    df[delivery_date_column] = pd.to_datetime(df[delivery_date_column], errors='coerce')
-
     # Extract unique values
-    df['month_year'] = df[date_column].dt.strftime('%b %Y')
     unique_months = df['month_year'].dropna().unique()
     unique_months = sorted(unique_months, key=lambda x: pd.to_datetime(x, format='%b %Y'), reverse=True)
 
-    df['delivery_month_year'] = df[delivery_date_column].dt.strftime('%b %Y')
     unique_delivery_month = df['delivery_month_year'].dropna().unique()
     unique_delivery_month = sorted(unique_delivery_month, key=lambda x: pd.to_datetime(x, format='%b %Y'), reverse=True)
 
@@ -70,13 +64,14 @@ def main():
     
 
     # ------------------------------------------------ Filter DataFrame by selected months ----------------------------------------------------
-    filtered_df = df[
-                        df['month_year'].isin(selected_months) & 
-                        df['delivery_month_year'].isin(selected_delivery_months) & 
-                        df['PI NUMBER'].isin(selected_pi) & 
-                        df['TRIP'].isin(selected_trip) & 
-                        (df['PLAN DATE'].isin(selected_plan_date) if selected_plan_date else True)
-                        ]
+    filtered_df = filter_orders(
+        df,
+        plan_dates=selected_plan_date,
+        months=selected_months,
+        delivery_months=selected_delivery_months,
+        trips=selected_trip,
+        pis=selected_pi,
+    )
 
     # Display filtered DataFrame
     st.dataframe(filtered_df)
@@ -87,27 +82,20 @@ def main():
     # Combine material sponge columns into a single series without duplicates
     unique_materials = pd.Series(df[material_sponge_columns].values.ravel()).dropna().str.strip().str.upper().unique()
 
-    # Initialize a DataFrame to store the results
-    result_data = [] 
+    # Explode every material slot into its own row so each order keeps its TIMESTAMP
+    usage_df = explode_material_usage(filtered_df, material_sponge_columns, sponge_columns)
 
-    # Loop through each unique material and sum its corresponding sponge values
-    for material in unique_materials:
-        total_value = 0
-        for material_col, sponge_col in zip(material_sponge_columns, sponge_columns):
-            material_mask = filtered_df[material_col] == material
-            sponge_values = pd.to_numeric(filtered_df.loc[material_mask, sponge_col], errors='coerce').dropna()
-            total_value += (sponge_values * filtered_df.loc[material_mask, 'QTY']).sum()
-        result_data.append({'Sponge Material': material, 'Total Usage': total_value})
+    # Price each row at the price in effect on its order date (as-of join on the price history)
+    price_history = cached_price_history(df_price_list, conn)
+    priced_usage_df = price_as_of(usage_df, price_history, material_column='MATERIAL', date_column='TIMESTAMP')
+    merge_result_price = summarize_material_cost(priced_usage_df, 'Sponge Material')
 
-    result_df = pd.DataFrame(result_data)
+    # Keep every known sponge material for the chart, including those unused in the selection
+    result_df = pd.DataFrame({'Sponge Material': unique_materials}).merge(
+        merge_result_price[['Sponge Material', 'Total Usage']], on='Sponge Material', how='left'
+    ).fillna({'Total Usage': 0})
 
-    
-    df_price_list['Description'] = df_price_list['Description'].str.strip().str.upper()
-    merge_result_price = pd.merge(result_df, df_price_list[['Description' ,'Unit Price']], left_on='Sponge Material', right_on='Description', how='left')
-    merge_result_price['Total Price'] = merge_result_price['Total Usage'] * merge_result_price['Unit Price']
-    merge_result_price.drop(columns=['Description'], inplace=True)
     merge_result_price = merge_result_price[merge_result_price['Total Usage'] > 0]
-    merge_result_price = merge_result_price.drop_duplicates(subset=['Sponge Material'], keep='first')
     merge_result_price = merge_result_price.sort_values(by='Total Price', ascending=False)
 
     # Key Metrics
@@ -4,6 +4,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import time
 
+from price_history import cached_price_history
+
 # Load user credentials from secrets
 def load_credentials():
     return st.secrets["users"]
@@ -56,6 +58,10 @@ def main():
 
         st.dataframe(df)
 
+        # Every price version recorded so far, used to cost orders at their order date
+        st.subheader("Price History")
+        st.dataframe(cached_price_history(df.dropna(how="all"), conn))
+
 if __name__ == "__main__":
     main()
 
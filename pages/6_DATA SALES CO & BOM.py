@@ -4,6 +4,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import time
 
+from material_usage import explode_bom
+from price_history import cached_price_history, price_as_of
+
 # Load user credentials from secrets
 def load_credentials():
     return st.secrets["users"]
@@ -57,7 +60,7 @@ def main():
         df_data_bom = df_data_bom.loc[:, ~df_data_bom.columns.str.contains('^Unnamed')]  # Remove any 'Unnamed' columns
 
         # Read and clean the "PRICE LIST" worksheet
-        df_price_list = conn.read(worksheet="PRICE LIST", ttl=300)
+        df_price_list = conn.read(worksheet="PRICE LIST", ttl=5)
         df_price_list = df_price_list.dropna(how="all")  # Drop rows where all elements are missing
         df_price_list = df_price_list.loc[:, ~df_price_list.columns.str.contains('^Unnamed')]  # Remove any 'Unnamed' columns
 
@@ -66,46 +69,21 @@ def main():
         df_order_list = df_order_list.dropna(how="all")  # Drop rows where all elements are missing
         df_order_list = df_order_list.loc[:, ~df_order_list.columns.str.contains('^Unnamed')]  # Remove any 'Unnamed' columns
 
-        # Merge "ORDER LIST" with "DATA BOM" on the 'MODEL' and 'CONFIRM MODEL NAME' columns
-        merge_data = pd.merge(df_order_list, df_data_bom, left_on='MODEL', right_on='CONFIRM MODEL NAME', how='left')
-
-        # Filter columns that contain raw materials and corresponding values
-        raw_materials = [col for col in merge_data.columns if 'MATERIAL' in col]
-        raw_materials_value_columns = [col for col in merge_data.columns if col.startswith(('WOOD', 'FABRIC', 'SPONGE', 'O.M'))]
-
-        # Melt the data to reshape it, extracting the raw materials and usage data
-        materials = merge_data.melt(
-            id_vars=['TIMESTAMP', 'PI NUMBER', 'ORDER', 'TYPE', 'MODEL', 'QTY'], 
-            value_vars=raw_materials, 
-            var_name='Material Column', 
-            value_name='MATERIAL'
-        )
-
-        usage = merge_data.melt(
-            id_vars=['PI NUMBER'], 
-            value_vars=raw_materials_value_columns, 
-            var_name='Usage Column', 
-            value_name='USAGE'
-        )
-
-        # Concatenate materials and usage data
-        materials_usage = pd.concat(
-            [materials[['TIMESTAMP', 'PI NUMBER', 'ORDER', 'TYPE', 'MODEL', 'QTY', 'MATERIAL']], usage['USAGE']], 
-            axis=1
-        )
-
-        # Drop rows with missing materials and remove duplicate records for each PI NUMBER and MATERIAL
-        materials_usage = materials_usage.dropna(subset=['MATERIAL'])
-        materials_usage = materials_usage.drop_duplicates(subset=['PI NUMBER', 'MATERIAL'])
+        # Explode each order into one row per (PI NUMBER, MATERIAL) using its model's DATA BOM
+        materials_usage = explode_bom(df_order_list, df_data_bom)
 
         # Display the material usage data in the Streamlit app
         # st.title('Material Usage')
         # st.text(f"Total rows: {len(materials_usage)}")
         # st.dataframe(materials_usage)
 
-        # Merge material usage with the price list data on 'MATERIAL' and 'Description' columns
+        # Price each material at the 'Unit Price' in effect on its order TIMESTAMP (as-of join on the price history)
+        price_history = cached_price_history(df_price_list, conn)
+        materials_usage_priced = price_as_of(materials_usage, price_history, material_column='MATERIAL', date_column='TIMESTAMP')
+
+        # Merge material usage with the remaining price list details on 'MATERIAL' and 'Description' columns
         merge_material_usage_price = pd.merge(
-            materials_usage, df_price_list, left_on='MATERIAL', right_on='Description', how='left'
+            materials_usage_priced, df_price_list.drop(columns=['Unit Price']), left_on='MATERIAL', right_on='Description', how='left'
         )
 
         # Clean the merged data by removing unnecessary columns and dropping duplicates
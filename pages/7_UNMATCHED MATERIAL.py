@@ -0,0 +1,115 @@
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+import pandas as pd
+import time
+
+from material_match import NgramIndex, collect_materials, reconcile_materials, unpriced_descriptions
+from price_history import cached_price_history
+
+# Worksheets holding material names and the columns that name them
+MATERIAL_SOURCES = {
+    "ORDER BY WOOD": "MATERIAL WOOD",
+    "ORDER BY SPONGE": "MATERIAL SPONGE",
+    "ORDER BY FABRIC": "MATERIAL FABRIC",
+    "ORDER BY OTHER MATERIAL": "OTHER MATERIAL",
+    "DATA BOM": "MATERIAL",
+}
+
+# Load user credentials from secrets
+def load_credentials():
+    return st.secrets["users"]
+
+# Check if the provided credentials are correct
+def authenticate(username, password, credentials):
+    return credentials.get(username) == password
+
+# Build the n-gram index over priced descriptions once per distinct set and share it across sessions
+@st.cache_resource(max_entries=2)
+def load_price_index(descriptions):
+    return NgramIndex(list(descriptions))
+
+# Main function to run the Streamlit app
+def main():
+    # Initialize session state for login status
+    if "logged_in" not in st.session_state:
+        st.session_state.logged_in = False
+        st.session_state.show_success = False
+
+    # Load credentials
+    credentials = load_credentials()
+
+    if not st.session_state.logged_in:
+        st.title("Login")
+        # Create login form
+        username = st.text_input("Email")
+        password = st.text_input("Password", type="password")
+
+        if st.button("Login"):
+            if authenticate(username, password, credentials):
+                st.session_state.logged_in = True
+                st.session_state.show_success = True
+                st.rerun()
+            else:
+                st.error("Invalid username or password")
+
+    if st.session_state.logged_in:
+        if st.session_state.show_success:
+            st.success("Login successful!")
+            time.sleep(3)
+            st.session_state.show_success = False
+            st.rerun()
+
+        # Google Sheets connection and data display
+
+        # Set the page layout to wide for better visualization
+        st.set_page_config(layout="wide")
+
+        st.title("Unmatched Materials")
+
+        # Establish a connection to Google Sheets
+        conn = st.connection("gsheets", type=GSheetsConnection)
+
+        # Read and clean the "PRICE LIST" worksheet
+        df_price_list = conn.read(worksheet="PRICE LIST", ttl=5)
+        df_price_list = df_price_list.dropna(how="all")  # Drop rows where all elements are missing
+
+        # A material counts as matched only if the price history used for costing has a price for it
+        price_history = cached_price_history(df_price_list, conn)
+        price_index = load_price_index(tuple(sorted(price_history['Description'].dropna().unique())))
+
+        # Collect every material named on the order sheets and DATA BOM
+        materials = []
+        for worksheet, material_prefix in MATERIAL_SOURCES.items():
+            df = conn.read(worksheet=worksheet, ttl=300)
+            df = df.dropna(how="all")  # Drop rows where all elements are missing
+            material_columns = [col for col in df.columns if material_prefix in col]
+            materials.append(collect_materials(df, material_columns, worksheet))
+        materials = pd.concat(materials, ignore_index=True)
+
+        # Sidebar controls for the suggestions
+        min_score = st.sidebar.slider("Minimum Match Score", 0.0, 1.0, 0.3, 0.05)
+        selected_sources = st.sidebar.multiselect("Select Source(s)", list(MATERIAL_SOURCES), default=list(MATERIAL_SOURCES))
+
+        materials = materials[materials['SOURCE'].isin(selected_sources)]
+        unmatched = reconcile_materials(
+            materials, price_index, min_score=min_score, missing_price=unpriced_descriptions(df_price_list)
+        )
+
+        # Key Metrics
+        total_material, total_unmatched, total_missing_price, total_suggested = st.columns(4)
+        with total_material:
+            st.metric("Total Material", value=materials['MATERIAL'].nunique())
+        with total_unmatched:
+            st.metric("Not on Price List", value=int((unmatched['STATUS'] == 'NOT ON PRICE LIST').sum()))
+        with total_missing_price:
+            st.metric("Price Missing", value=int((unmatched['STATUS'] == 'PRICE MISSING').sum()))
+        with total_suggested:
+            st.metric("With Suggestion", value=int(unmatched['SUGGESTION 1'].notna().sum()))
+
+        # Materials that get no price, with the closest priced descriptions
+        st.subheader("Materials Without a Price")
+        st.dataframe(unmatched)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+import pandas as pd
+import time
+
+from material_usage import CATEGORIES, prepare_orders
+from pi_index import build_pi_index
+from price_history import cached_price_history
+
+# Load user credentials from secrets
+def load_credentials():
+    return st.secrets["users"]
+
+# Check if the provided credentials are correct
+def authenticate(username, password, credentials):
+    return credentials.get(username) == password
+
+# Read every "ORDER BY ..." sheet and build the PI index once per refresh, shared across sessions.
+# The resource's ttl sets the refresh interval, so the sheets are read uncached (ttl=0) and
+# "Refresh Data" picks up edits immediately.
+@st.cache_resource(ttl=300)
+def load_pi_index():
+    conn = st.connection("gsheets", type=GSheetsConnection)
+    orders = {
+        category: prepare_orders(conn.read(worksheet=config['worksheet'], ttl=0))
+        for category, config in CATEGORIES.items()
+    }
+    df_price_list = conn.read(worksheet="PRICE LIST", ttl=0)
+    df_price_list = df_price_list.dropna(how="all")  # Drop rows where all elements are missing
+    return build_pi_index(orders, cached_price_history(df_price_list, conn))
+
+# Main function to run the Streamlit app
+def main():
+    # Initialize session state for login status
+    if "logged_in" not in st.session_state:
+        st.session_state.logged_in = False
+        st.session_state.show_success = False
+
+    # Load credentials
+    credentials = load_credentials()
+
+    if not st.session_state.logged_in:
+        st.title("Login")
+        # Create login form
+        username = st.text_input("Email")
+        password = st.text_input("Password", type="password")
+
+        if st.button("Login"):
+            if authenticate(username, password, credentials):
+                st.session_state.logged_in = True
+                st.session_state.show_success = True
+                st.rerun()
+            else:
+                st.error("Invalid username or password")
+
+    if st.session_state.logged_in:
+        if st.session_state.show_success:
+            st.success("Login successful!")
+            time.sleep(3)
+            st.session_state.show_success = False
+            st.rerun()
+
+        # Google Sheets connection and data display
+
+        # Set the page layout to wide for better visualization
+        st.set_page_config(layout="wide")
+
+        st.title("PI Cost Drill Down")
+
+        if st.sidebar.button("Refresh Data"):
+            load_pi_index.clear()
+
+        pi_index = load_pi_index()
+
+        selected_pi = st.sidebar.multiselect("Select PI(s) to Compare", pi_index.pis)
+        compare_value = st.sidebar.radio("Compare by:", ('Total Price', 'Total Usage'), index=0)
+
+        if not selected_pi:
+            st.info("Select one or more PI(s) in the sidebar to see their bill of materials and cost.")
+            return
+
+        # Key Metrics per selected PI
+        totals = pi_index.totals(selected_pi)
+        st.subheader("Cost per PI")
+        st.dataframe(totals)
+        st.bar_chart(totals.set_index('PI NUMBER')[[category for category in CATEGORIES if category in totals.columns]])
+
+        if len(selected_pi) == 1:
+            bill = pi_index.bill_of_materials(selected_pi[0])
+
+            total_material, total_price = st.columns(2)
+            with total_material:
+                st.metric("Total Material", value=len(bill))
+            with total_price:
+                st.metric("Total Price", value="RM " + str(round(bill['Total Price'].sum(), 2)))
+
+            st.subheader(f"Bill of Materials for {selected_pi[0]}")
+            st.dataframe(bill)
+        else:
+            st.subheader(f"{compare_value} by Material")
+            st.dataframe(pi_index.compare(selected_pi, value=compare_value))
+
+        with st.expander("Usage Rows"):
+            st.dataframe(pd.concat([pi_index.rows(pi) for pi in selected_pi], ignore_index=True))
+
+
+if __name__ == "__main__":
+    main()
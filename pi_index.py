@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from material_usage import explode_orders
+from price_history import price_as_of
+
+
+# Priced usage rows grouped by PI NUMBER: rows are sorted by PI once and each PI keeps the
+# (start, end) offsets of its block, so a drill-down slices its rows instead of filtering them all.
+class PiIndex:
+    def __init__(self, priced_usage):
+        usage = priced_usage.dropna(subset=['PI NUMBER'])
+
+        # Strip each distinct PI once; PIs that differ only by spacing share one block
+        raw_codes, raw_pis = pd.factorize(usage['PI NUMBER'])
+        pi_codes, pis = pd.factorize(pd.Series(raw_pis, dtype=object).astype(str).str.strip())
+        codes = pi_codes[raw_codes]
+        usage = usage.assign(**{
+            'PI NUMBER': pis[codes],
+            'Total Price': usage['USAGE'] * usage['Unit Price'],
+        })
+
+        order = np.argsort(codes, kind='stable')
+        self.usage = usage.iloc[order].reset_index(drop=True)
+
+        sorted_codes = codes[order]
+        starts = np.searchsorted(sorted_codes, np.arange(len(pis)), side='left')
+        ends = np.searchsorted(sorted_codes, np.arange(len(pis)), side='right')
+        self.offsets = dict(zip(pis, zip(starts.tolist(), ends.tolist())))
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, pi):
+        return str(pi).strip() in self.offsets
+
+    @property
+    def pis(self):
+        return sorted(self.offsets)
+
+    # Every exploded usage row of one PI
+    def rows(self, pi):
+        start, end = self.offsets.get(str(pi).strip(), (0, 0))
+        return self.usage.iloc[start:end]
+
+    # Cross-category bill of materials of one PI with usage-weighted unit price and total cost
+    def bill_of_materials(self, pi):
+        rows = self.rows(pi)
+        grouped = rows.groupby(['CATEGORY', 'MATERIAL'], sort=False)
+        bill = pd.DataFrame({
+            'Total Usage': grouped['USAGE'].sum(),
+            'Total Price': grouped['Total Price'].sum(min_count=1),
+        }).reset_index()
+        bill['Unit Price'] = bill['Total Price'] / bill['Total Usage']
+        bill = bill[['CATEGORY', 'MATERIAL', 'Total Usage', 'Unit Price', 'Total Price']]
+        return bill.sort_values(by='Total Price', ascending=False, ignore_index=True)
+
+    # Cost and material count per category for each PI, one row per PI.
+    # A cost with no priced material at all stays NaN instead of reading as 0.
+    def totals(self, pis):
+        rows = []
+        for pi in pis:
+            bill = self.bill_of_materials(pi)
+            row = {'PI NUMBER': str(pi).strip(), 'Total Material': len(bill),
+                   'Unpriced Material': int(bill['Unit Price'].isna().sum())}
+            row.update(bill.groupby('CATEGORY')['Total Price'].sum(min_count=1).to_dict())
+            row['Total Price'] = bill['Total Price'].sum(min_count=1)
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    # Side-by-side bills of several PIs: one row per material, one column per PI.
+    # A material the PI does not use shows 0; one it uses without a price stays NaN.
+    def compare(self, pis, value='Total Price'):
+        pis = dict.fromkeys(str(pi).strip() for pi in pis)  # a PI listed twice is still one column
+        bills = [self.bill_of_materials(pi).assign(**{'PI NUMBER': pi}) for pi in pis]
+        if not bills:
+            return pd.DataFrame()
+        grouped = pd.concat(bills, ignore_index=True).groupby(['CATEGORY', 'MATERIAL', 'PI NUMBER'])
+        values = grouped[value].sum(min_count=1).unstack('PI NUMBER')
+        absent = grouped.size().unstack('PI NUMBER').isna()
+        return values.mask(absent, 0).reset_index()
+
+
+# Build the index from prepared "ORDER BY ..." sheets, priced with one as-of join across all categories
+def build_pi_index(orders, price_history):
+    return PiIndex(price_as_of(explode_orders(orders), price_history))
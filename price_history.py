@@ -0,0 +1,213 @@
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from gspread.exceptions import WorksheetNotFound
+
+# Every PRICE LIST snapshot is kept in the "PRICE HISTORY" worksheet, which survives redeploys;
+# the CSV is only a local cache of it (PRICE_HISTORY_PATH overrides its location)
+PRICE_HISTORY_WORKSHEET = "PRICE HISTORY"
+PRICE_HISTORY_PATH = os.environ.get(
+    "PRICE_HISTORY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "price_history.csv")
+)
+
+HISTORY_COLUMNS = ['Description', 'Unit Price', 'EFFECTIVE DATE']
+
+# Serializes read-merge-write of the history between sessions of this process
+_history_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+# Normalize material names so order sheets and the price list line up.
+# Names repeat heavily, so only the distinct values go through the string methods.
+def normalize_description(values):
+    codes, uniques = pd.factorize(values)
+    normalized = pd.Series(uniques, dtype=object).astype("string").str.strip().str.upper()
+    return pd.Series(normalized.array.take(codes, allow_fill=True), index=values.index, dtype="string")
+
+
+# Turn the raw "PRICE LIST" worksheet into (Description, Unit Price, EFFECTIVE DATE) rows.
+# The sheet's 'Update' column is the effective date; rows without one take effect on `recorded_at`.
+def price_list_snapshot(df_price_list, recorded_at=None):
+    if recorded_at is None:
+        recorded_at = pd.Timestamp.now().normalize()
+
+    snapshot = pd.DataFrame({
+        'Description': normalize_description(df_price_list['Description']),
+        'Unit Price': pd.to_numeric(df_price_list['Unit Price'], errors='coerce'),
+    })
+    if 'Update' in df_price_list.columns:
+        snapshot['EFFECTIVE DATE'] = pd.to_datetime(df_price_list['Update'], errors='coerce').fillna(recorded_at)
+    else:
+        snapshot['EFFECTIVE DATE'] = recorded_at
+    snapshot['EFFECTIVE DATE'] = snapshot['EFFECTIVE DATE'].astype('datetime64[ns]')
+
+    snapshot = snapshot.dropna(subset=['Description', 'Unit Price'])
+    return snapshot.drop_duplicates(subset=['Description', 'EFFECTIVE DATE'], keep='first')
+
+
+def empty_price_history():
+    return pd.DataFrame({
+        'Description': pd.Series(dtype='string'),
+        'Unit Price': pd.Series(dtype='float64'),
+        'EFFECTIVE DATE': pd.Series(dtype='datetime64[ns]'),
+    })
+
+
+# Coerce a stored history (CSV or worksheet) to the history columns and dtypes
+def clean_price_history(history):
+    history = history.dropna(how="all")
+    if history.empty or not set(HISTORY_COLUMNS) <= set(history.columns):
+        return empty_price_history()
+    return pd.DataFrame({
+        'Description': history['Description'].astype('string'),
+        'Unit Price': pd.to_numeric(history['Unit Price'], errors='coerce'),
+        'EFFECTIVE DATE': pd.to_datetime(history['EFFECTIVE DATE'], errors='coerce').astype('datetime64[ns]'),
+    }).dropna().reset_index(drop=True)
+
+
+# Read the locally cached price history (empty if nothing has been cached yet)
+def load_price_history(path=PRICE_HISTORY_PATH):
+    if not os.path.exists(path):
+        return empty_price_history()
+    return clean_price_history(pd.read_csv(path, dtype={'Description': 'string'}))
+
+
+# Read the durable "PRICE HISTORY" worksheet; None only when it has not been created yet.
+# Any other failure (quota, timeout, Sheets down) raises: a partial history must not be recorded.
+def read_price_history_worksheet(conn):
+    try:
+        return clean_price_history(conn.read(worksheet=PRICE_HISTORY_WORKSHEET, ttl=0))
+    except WorksheetNotFound:
+        return None
+
+
+# Write the full history to the "PRICE HISTORY" worksheet, creating it on first use
+def write_price_history_worksheet(conn, history, exists=True):
+    data = history.assign(**{'EFFECTIVE DATE': history['EFFECTIVE DATE'].dt.strftime('%Y-%m-%d')})
+    try:
+        if exists:
+            conn.update(worksheet=PRICE_HISTORY_WORKSHEET, data=data)
+        else:
+            conn.create(worksheet=PRICE_HISTORY_WORKSHEET, data=data)
+    except Exception as exc:
+        logger.warning("Could not write the %s worksheet: %s", PRICE_HISTORY_WORKSHEET, exc)
+
+
+# Write the local CSV cache; write then rename so concurrent readers never see a half-written file
+def write_price_history_cache(history, path=PRICE_HISTORY_PATH):
+    try:
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        history.to_csv(temp_path, index=False)
+        os.replace(temp_path, path)
+    except OSError:
+        # Read-only deployments still get the in-memory history for this run
+        pass
+
+
+def sort_price_history(history):
+    return history.sort_values(['Description', 'EFFECTIVE DATE'], ignore_index=True)
+
+
+def same_price_history(left, right):
+    left, right = sort_price_history(left), sort_price_history(right)
+    return all(left[column].equals(right[column]) for column in HISTORY_COLUMNS)
+
+
+# Merge the current price list into the stored history and persist it where it changed.
+# The "PRICE HISTORY" worksheet (through `conn`) is the source of truth, the CSV only caches it;
+# a (Description, EFFECTIVE DATE) pair seen again keeps the price from this snapshot.
+def record_price_snapshot(df_price_list, path=PRICE_HISTORY_PATH, recorded_at=None, conn=None):
+    snapshot = price_list_snapshot(df_price_list, recorded_at=recorded_at)
+
+    with _history_lock:
+        cached = load_price_history(path)
+        durable = read_price_history_worksheet(conn) if conn is not None else None
+
+        # Versions the worksheet has win over the local cache; the cache fills in what the sheet lacks
+        stored = cached if durable is None else pd.concat([durable, cached], ignore_index=True)
+        stored = stored.drop_duplicates(subset=['Description', 'EFFECTIVE DATE'], keep='first')
+
+        history = pd.concat([stored, snapshot], ignore_index=True)
+        history = history.drop_duplicates(subset=['Description', 'EFFECTIVE DATE'], keep='last')
+        history = sort_price_history(history)
+
+        # A price that did not change is not a new version (undated rows would otherwise repeat daily)
+        repeated = (history['Description'] == history['Description'].shift()) & \
+            (history['Unit Price'] == history['Unit Price'].shift())
+        history = history[~repeated.fillna(False).astype(bool)].reset_index(drop=True)
+
+        # Only write where the snapshot added or changed a price
+        if conn is not None and (durable is None or not same_price_history(history, durable)):
+            write_price_history_worksheet(conn, history, exists=durable is not None)
+        if not same_price_history(history, cached):
+            write_price_history_cache(history, path)
+    return history
+
+
+# Record each distinct PRICE LIST once per day and process: reruns that read the same contents,
+# including a page still holding an older cached read, reuse the stored result instead of
+# rewriting history. The day is part of the key so a list that returns to earlier contents,
+# or keeps undated rows, is recorded again.
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_price_history(df_price_list, recorded_at, _conn=None, path=PRICE_HISTORY_PATH):
+    return record_price_snapshot(df_price_list, path=path, recorded_at=recorded_at, conn=_conn)
+
+
+# Price history for the pages. When the "PRICE HISTORY" worksheet cannot be read, fall back to
+# the local cache for this run only, without caching it or writing the worksheet; the next rerun retries.
+def cached_price_history(df_price_list, conn=None, path=PRICE_HISTORY_PATH):
+    recorded_at = pd.Timestamp.now().normalize()
+    try:
+        return _cached_price_history(df_price_list, recorded_at, conn, path=path)
+    except Exception as exc:
+        if conn is None:
+            raise
+        logger.warning("Could not read the %s worksheet, using the local cache: %s", PRICE_HISTORY_WORKSHEET, exc)
+        return record_price_snapshot(df_price_list, path=path, recorded_at=recorded_at)
+
+
+# Attach the 'Unit Price' in effect at each row's order date.
+# Uses one sorted as-of join over the whole frame instead of a lookup per row:
+# the latest price with EFFECTIVE DATE <= date wins; orders placed before the first
+# recorded price fall back to the earliest price, and rows without a date get the latest one.
+def price_as_of(usage, history, material_column='MATERIAL', date_column='TIMESTAMP'):
+    # Normalize each distinct material once, then join on integer codes instead of strings
+    row_codes, materials = pd.factorize(usage[material_column])
+    descriptions = pd.Index(history['Description'].astype('string').unique()).dropna()
+    material_keys = descriptions.get_indexer(normalize_description(pd.Series(materials)))
+    row_keys = np.append(material_keys, -1)[row_codes]  # factorize marks missing materials as -1
+
+    left = pd.DataFrame({
+        '_row': np.arange(len(usage)),
+        '_key': row_keys,
+        '_date': pd.to_datetime(usage[date_column], errors='coerce').astype('datetime64[ns]')
+            .fillna(pd.Timestamp.max).to_numpy(),
+    })
+    right = pd.DataFrame({
+        '_key': descriptions.get_indexer(history['Description'].astype('string')),
+        '_date': history['EFFECTIVE DATE'].astype('datetime64[ns]').to_numpy(),
+        'Unit Price': history['Unit Price'].to_numpy(dtype='float64'),
+    })
+
+    # Materials missing from the history keep a NaN price
+    left = left[left['_key'] >= 0].sort_values('_date', kind='mergesort')
+    right = right[right['_key'] >= 0].sort_values('_date', kind='mergesort')
+
+    priced = pd.merge_asof(left, right, on='_date', by='_key', direction='backward')
+    missing = priced['Unit Price'].isna().to_numpy()
+    if missing.any():
+        earliest = pd.merge_asof(priced.loc[missing, ['_row', '_key', '_date']], right,
+                                 on='_date', by='_key', direction='forward')
+        priced.loc[missing, 'Unit Price'] = earliest['Unit Price'].to_numpy()
+
+    unit_price = np.full(len(usage), np.nan)
+    unit_price[priced['_row'].to_numpy()] = priced['Unit Price'].to_numpy()
+
+    result = usage.copy()
+    result['Unit Price'] = unit_price
+    return result